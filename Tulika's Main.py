@@ -1,11 +1,25 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import logging
-from typing import List
+from typing import List, Sequence
 import openpyxl
 from matplotlib.ticker import MaxNLocator
 
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
 # Configure logging and styling
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,31 +27,166 @@ logger = logging.getLogger(__name__)
 # Initialize Seaborn theme and palette
 sns.set_theme(style="whitegrid", palette="husl")  
 
+# Anything that is not part of a plain decimal number, stripped before numeric conversion
+_NON_NUMERIC = re.compile(r'[^\d.]')
+
+def _excel_cell(value):
+    # Same cell values DataFrame.to_excel writes: blanks for NaN/NaT, 'inf'/'-inf' for
+    # infinities (which neither xlsxwriter nor openpyxl can store as numbers)
+    if pd.isna(value):
+        return None
+    if isinstance(value, (float, np.floating)) and np.isinf(value):
+        return 'inf' if value > 0 else '-inf'
+    return value
+
 class ExcelDataAnalyzer:
+    # Loaded workbooks shared by analyzer instances, keyed by absolute file path. An entry
+    # lives only until an analyzer takes its working copy, so it dedupes loads made before
+    # cleaning without keeping the raw frame alive alongside every copy
+    _CACHE = {}
     
     def __init__(self, file_path: str):
         self.file_path = file_path
-        self.df = self._load_excel()
+        self._df = None
         self.visualization_paths = []
 
+    @property
+    def df(self) -> pd.DataFrame:
+        # Loaded on first access; until _take_working_copy runs, this is the shared cached frame
+        if self._df is None:
+            key = os.path.abspath(self.file_path)
+            if key not in self._CACHE:
+                self._CACHE[key] = self._load_excel()
+            self._df = self._CACHE[key]
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame):
+        self._df = value
+
+    def _take_working_copy(self):
+        # Private copy for in-place cleaning; the cache entry is released at the same time
+        self.df = self.df.copy()
+        self._CACHE.pop(os.path.abspath(self.file_path), None)
+
     def _load_excel(self) -> pd.DataFrame:
+        # Columnar sidecar written on the first load; reused while newer than the workbook
+        cache_path = f"{self.file_path}.parquet"
+        df = self._read_parquet_cache(cache_path)
+        if df is not None:
+            return df
         try:
-            return pd.read_excel(self.file_path, engine='openpyxl')
+            # pandas' openpyxl reader already opens workbooks read_only, data_only and without links
+            df = pd.read_excel(self.file_path, engine='openpyxl')
         except Exception as e:
             logger.error(f"Failed to load {self.file_path}: {str(e)}")
             raise
+        self._write_parquet_cache(df, cache_path)
+        return df
 
-    def _save_visualization(self, fig, name: str):
+    def _read_parquet_cache(self, cache_path: str):
+        if (pyarrow is None or not os.path.exists(cache_path) or not os.path.exists(self.file_path)
+                or os.path.getmtime(cache_path) < os.path.getmtime(self.file_path)):
+            return None
+        try:
+            return pd.read_parquet(cache_path, engine='pyarrow')
+        except Exception as e:
+            # A damaged sidecar must never block loading; drop it and read the workbook
+            logger.warning(f"Ignoring unreadable Parquet cache {cache_path}: {str(e)}")
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            return None
+
+    def _write_parquet_cache(self, df: pd.DataFrame, cache_path: str):
+        if pyarrow is None:
+            return
+        # Object columns mixing numbers and text can't be stored by pyarrow; spot them up front
+        # instead of building an Arrow table only to have it rejected on every run
+        mixed = [c for c in df.columns
+                 if df[c].dtype == object and pd.api.types.infer_dtype(df[c]) in ('mixed', 'mixed-integer')]
+        if mixed:
+            logger.info(f"Not caching {self.file_path} as Parquet; mixed-type columns: {mixed}")
+            return
+        # Write to a temp file and move it into place, so an interrupted write never leaves a
+        # truncated sidecar behind
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+            os.replace(tmp_path, cache_path)
+        except (OSError, ValueError, TypeError, pyarrow.ArrowException) as e:
+            logger.warning(f"Could not cache {self.file_path} as Parquet: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def save_excel(self, path: str):
+        # Cells are converted one row at a time, so no object copy of the whole frame is built
+        rows = (tuple(_excel_cell(v) for v in row) for row in self.df.itertuples(index=False, name=None))
+        if xlsxwriter is not None:
+            # Rows are written strictly in order, so constant_memory can flush each one to disk
+            wb = xlsxwriter.Workbook(path, {'constant_memory': True,
+                                            'default_date_format': 'yyyy-mm-dd hh:mm:ss'})
+            ws = wb.add_worksheet()
+            ws.write_row(0, 0, list(self.df.columns))
+            for i, row in enumerate(rows, 1):
+                ws.write_row(i, 0, row)
+            wb.close()
+        else:
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet('Sheet1')
+            ws.append(list(self.df.columns))
+            for row in rows:
+                ws.append(row)
+            wb.save(path)
+        logger.info(f"Saved analyzed data: {path}")
+
+    def _save_visualization(self, fig, name: str, dpi: int = 100):
         path = f"{self.__class__.__name__}_{name}.png"
-        fig.savefig(path, bbox_inches='tight', dpi=300)
-        plt.close(fig)
+        # tight_layout instead of bbox_inches='tight', which renders the figure twice
+        fig.tight_layout()
+        # 100 dpi trades resolution (1000x600 instead of 3000x1800 px) for faster saves and
+        # smaller PNGs; pass a higher dpi where print quality matters
+        fig.savefig(path, dpi=dpi)
         self.visualization_paths.append(path)
         logger.info(f"Saved visualization: {path}")
 
+    @staticmethod
+    def _vectorized_match(text_lc: pd.Series, keys: Sequence[str], default: str = 'Other') -> pd.Series:
+        # First key, in the given order, contained in each lowercased value: one C-level
+        # substring scan per key, with np.select giving earlier keys priority
+        conditions = [text_lc.str.contains(key.lower(), regex=False, na=False).to_numpy(dtype=bool)
+                      for key in keys]
+        return pd.Series(np.select(conditions, list(keys), default), index=text_lc.index, dtype=object)
+
     def get_visualizations(self) -> List[str]:
         return self.visualization_paths
 
 class Task1Analyzer(ExcelDataAnalyzer):
+    # Define the detailed taxonomy mapping
+    _TAXONOMY = {
+        'Not Tightened': ('Loose', 'Cab P Clip', 'Retightened', 'Cab P Clip'),
+        'Not Installed': ("Won't stay open", 'Fuel Door', 'Installed', 'Gas Strut'),
+        'Not Mentioned': ('Crushed', 'Compressor Pressure Line', 'Replaced', 'Braided Steel'),
+        'Loosened': ('Oil Running', 'Not Mentioned', 'Topped Off', 'O-Ring'),
+        'Not Included': ('Missing', 'Vector', 'Not Mentioned', 'Vector'),
+        'Out of Fitting': ('Oil Dripping', 'Coupler', 'Cleaned Out', 'Coupler'),
+        'Blown': ('Oil Leak', 'Mount SVM Sign', 'Reseted', 'Brackets'),
+        'Poor Material': ('Broke', 'Harness', 'Repaired', 'Hydraulic'),
+        'Leaking': ('Leak', 'Rinse Tank', 'Tightened', 'Not Mentioned'),
+        'Failed Sending': ('Open', 'Fuel Sender', '', 'NCV Harness'),
+        'No Oring': ('Hydraulic Leak', 'Boom', '', 'Tube'),
+        'Not Tighten': ('Fold Uneven', 'Auto Boom', '', 'Oring'),
+        'Out of Range': ('Getting Fault Code', 'Condenser', '', 'Sensor'),
+        'Lubricant Drip Drown': ('Not Working', 'Left-Air Duct', '', 'Counter'),
+        'Fault': ('Error Codes', 'Bulkhead Connector', '', 'Threads'),
+        'Internal Issue': ('Product Leak', 'Braided Steel', '', 'Left Air Duct'),
+        'Screwed in a Thread': ('Does not Light', 'Intrip Unlocks', '', 'Compressor Line'),
+        'Faulty': ('', 'Sensor', '', 'Intrip Unlocks'),
+    }
+
+    # Root causes in match priority order, built once at import
+    _ROOT_KEYS = tuple(_TAXONOMY)
     
     def analyze(self):
         self._clean_data()
@@ -45,80 +194,81 @@ class Task1Analyzer(ExcelDataAnalyzer):
         self._generate_visualizations()
 
     def _clean_data(self):
+        self._take_working_copy()
+
         # Date handling
-        self.df['Order Date'] = pd.to_datetime(self.df['Order Date'], errors='coerce')
+        dates = self.df['Order Date']
+        if pd.api.types.is_numeric_dtype(dates):
+            # Excel serial day numbers
+            self.df['Order Date'] = pd.to_datetime(dates, unit='D', origin='1899-12-30', errors='coerce')
+        elif not pd.api.types.is_datetime64_any_dtype(dates):
+            # Try ISO dates first, falling back to per-element inference only if some fail to parse
+            parsed = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce', cache=True)
+            if parsed.isna().sum() > dates.isna().sum():
+                parsed = pd.to_datetime(dates, format='mixed', errors='coerce', cache=True)
+            self.df['Order Date'] = parsed
         
         # Text cleaning
         text_cols = ['Complaint', 'Cause', 'Correction']
-        self.df[text_cols] = self.df[text_cols].apply(lambda x: x.str.strip())
+        self.df = self.df.assign(**{c: self.df[c].str.strip() for c in text_cols})
 
     def _add_taxonomy_tags(self):
-        # Define the detailed taxonomy mapping
-        taxonomy_mapping = {
-            'Not Tightened': ('Loose', 'Cab P Clip', 'Retightened', 'Cab P Clip'),
-            'Not Installed': ("Won't stay open", 'Fuel Door', 'Installed', 'Gas Strut'),
-            'Not Mentioned': ('Crushed', 'Compressor Pressure Line', 'Replaced', 'Braided Steel'),
-            'Loosened': ('Oil Running', 'Not Mentioned', 'Topped Off', 'O-Ring'),
-            'Not Included': ('Missing', 'Vector', 'Not Mentioned', 'Vector'),
-            'Out of Fitting': ('Oil Dripping', 'Coupler', 'Cleaned Out', 'Coupler'),
-            'Blown': ('Oil Leak', 'Mount SVM Sign', 'Reseted', 'Brackets'),
-            'Poor Material': ('Broke', 'Harness', 'Repaired', 'Hydraulic'),
-            'Leaking': ('Leak', 'Rinse Tank', 'Tightened', 'Not Mentioned'),
-            'Failed Sending': ('Open', 'Fuel Sender', '', 'NCV Harness'),
-            'No Oring': ('Hydraulic Leak', 'Boom', '', 'Tube'),
-            'Not Tighten': ('Fold Uneven', 'Auto Boom', '', 'Oring'),
-            'Out of Range': ('Getting Fault Code', 'Condenser', '', 'Sensor'),
-            'Lubricant Drip Drown': ('Not Working', 'Left-Air Duct', '', 'Counter'),
-            'Fault': ('Error Codes', 'Bulkhead Connector', '', 'Threads'),
-            'Internal Issue': ('Product Leak', 'Braided Steel', '', 'Left Air Duct'),
-            'Screwed in a Thread': ('Does not Light', 'Intrip Unlocks', '', 'Compressor Line'),
-            'Faulty': ('', 'Sensor', '', 'Intrip Unlocks'),
-        }
+        # Lowercase the causes once for every match below
+        cause_lc = self.df['Cause'].str.lower()
 
-        # First basic Root Cause
-        self.df['Root Cause'] = self.df['Cause'].apply(
-            lambda x: next((root for root in taxonomy_mapping if root.lower() in str(x).lower()), 'Other')
-        )
-        
-        # Fill Symptom Condition and Components
-        self.df['Symptom Condition 1'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', 'Other', '', ''))[0])
-        self.df['Symptom Condition 2'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', 'Other', ''))[1])
-        self.df['Symptom Condition 3'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', 'Other'))[2])
+        # First basic Root Cause: the first taxonomy key, in mapping order, found in the cause
+        root_cause = self._vectorized_match(cause_lc, self._ROOT_KEYS)
+
+        # Output tag -> (taxonomy tuple slot, value for unmatched causes), as in the
+        # original per-column lookups
+        tag_spec = {
+            'Symptom Condition 1': (0, ''), 'Symptom Condition 2': (1, ''), 'Symptom Condition 3': (2, ''),
+            'Symptom Component 1': (1, 'Other'), 'Symptom Component 2': (2, 'Other'),
+            'Symptom Component 3': (3, 'Other'),
+            'Fix Condition 1': (0, ''), 'Fix Condition 2': (1, ''), 'Fix Condition 3': (2, ''),
+            'Fix Component 1': (3, 'Other'), 'Fix Component 2': (3, ''), 'Fix Component 3': (3, ''),
+        }
 
-        self.df['Symptom Component 1'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', 'Other', '', ''))[1])
-        self.df['Symptom Component 2'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', 'Other', ''))[2])
-        self.df['Symptom Component 3'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', 'Other'))[3])
+        # Taxonomy as one column per tuple slot; a single reindex by Root Cause gathers
+        # all four slots for every row, and the twelve tags are projections of those
+        tax_df = pd.DataFrame.from_dict(self._TAXONOMY, orient='index')
+        slots = tax_df.reindex(root_cause)
+        tags = {'Root Cause': root_cause.to_numpy()}
+        for name, (slot, default) in tag_spec.items():
+            tags[name] = slots[slot].fillna(default).to_numpy()
 
-        # Fix Conditions and Components
-        self.df['Fix Condition 1'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', 'Other'))[0])
-        self.df['Fix Condition 2'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', ''))[1])
-        self.df['Fix Condition 3'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', ''))[2])
+        # Low-cardinality columns that get counted for the charts; categories follow
+        # first appearance so value_counts breaks ties in the same order as before
+        for c in ['Root Cause', 'Symptom Component 1', 'Fix Condition 1']:
+            tags[c] = pd.Categorical(tags[c], categories=pd.unique(tags[c]))
 
-        self.df['Fix Component 1'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', 'Other'))[3])
-        self.df['Fix Component 2'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', ''))[3])
-        self.df['Fix Component 3'] = self.df['Root Cause'].apply(lambda x: taxonomy_mapping.get(x, ('', '', '', ''))[3])
+        # Attach all thirteen columns in one assign rather than one insert per column
+        self.df = self.df.assign(**tags)
 
     def _generate_visualizations(self):
+        # One figure is reused for every chart and closed once at the end
+        fig, ax = plt.subplots(figsize=(10, 6))
+
         # Visualization 1: Root Cause Distribution
-        fig1, ax1 = plt.subplots(figsize=(10, 6))
-        self.df['Root Cause'].value_counts().plot(kind='bar', ax=ax1)
-        ax1.set_title('Root Cause Distribution')
-        ax1.set_ylabel('Count')
-        self._save_visualization(fig1, 'root_cause_distribution')
+        self.df['Root Cause'].value_counts().plot(kind='bar', ax=ax)
+        ax.set_title('Root Cause Distribution')
+        ax.set_ylabel('Count')
+        self._save_visualization(fig, 'root_cause_distribution')
 
         # Visualization 2: Symptom Frequency
-        fig2, ax2 = plt.subplots(figsize=(10, 6))
-        self.df['Symptom Component 1'].value_counts().plot(kind='pie', autopct='%1.1f%%', ax=ax2)
-        ax2.set_title('Symptom Component Distribution')
-        ax2.set_ylabel('')
-        self._save_visualization(fig2, 'symptom_component_distribution')
+        ax.clear()
+        self.df['Symptom Component 1'].value_counts().plot(kind='pie', autopct='%1.1f%%', ax=ax)
+        ax.set_title('Symptom Component Distribution')
+        ax.set_ylabel('')
+        self._save_visualization(fig, 'symptom_component_distribution')
 
         # Visualization 3: Fix Condition Distribution
-        fig3, ax3 = plt.subplots(figsize=(10, 6))
-        self.df['Fix Condition 1'].value_counts().plot(kind='pie', autopct='%1.1f%%', ax=ax3)
-        ax3.set_title('Fix Condition Distribution')
-        ax3.set_ylabel('')
-        self._save_visualization(fig3, 'fix_condition_distribution')
+        ax.clear()
+        self.df['Fix Condition 1'].value_counts().plot(kind='pie', autopct='%1.1f%%', ax=ax)
+        ax.set_title('Fix Condition Distribution')
+        ax.set_ylabel('')
+        self._save_visualization(fig, 'fix_condition_distribution')
+        plt.close(fig)
 
 class Task2Analyzer(ExcelDataAnalyzer):
     
@@ -128,43 +278,60 @@ class Task2Analyzer(ExcelDataAnalyzer):
         self._generate_visualizations()
 
     def _clean_data(self):
+        self._take_working_copy()
+
         num_cols = ['TOTALCOST', 'KM', 'REPAIR_AGE']
-        self.df[num_cols] = self.df[num_cols].apply(
-            lambda x: pd.to_numeric(x.astype(str).str.replace('[^\d.]', '', regex=True), errors='coerce'))
-        self.df['CUSTOMER_VERBATIM'] = self.df['CUSTOMER_VERBATIM'].str[:500]
+        for c in num_cols:
+            s = self.df[c]
+            # Columns Excel already delivered as numbers skip the string round-trip
+            if not pd.api.types.is_numeric_dtype(s):
+                s = s.astype(str).str.replace(_NON_NUMERIC, '', regex=True)
+            self.df[c] = pd.to_numeric(s, errors='coerce')
 
     def _add_engineering_tags(self):
         components = ['steering', 'sensor', 'module', 'harness', 'strut']
-        self.df['Failure Component'] = self.df['CUSTOMER_VERBATIM'].apply(
-            lambda x: next((c for c in components if c in str(x).lower()), 'Other'))
-        self.df['Cost Category'] = pd.cut(self.df['TOTALCOST'],
-                                         bins=[0, 100, 500, 1000, float('inf')],
-                                         labels=['<100', '100-500', '500-1000', '>1000'])
+        # Truncate once; the first component in list order found in the text is the failure
+        verbatim = self.df['CUSTOMER_VERBATIM'].str[:500]
+        self.df['CUSTOMER_VERBATIM'] = verbatim
+        verbatim_lc = verbatim.str.lower()
+        failure = self._vectorized_match(verbatim_lc, components)
+        self.df['Failure Component'] = failure.astype(pd.CategoricalDtype(failure.unique()))
+        # Same right-closed bins as pd.cut(bins=[0, 100, 500, 1000, inf]); code -1 (NaN)
+        # for costs <= 0 or missing
+        tc = self.df['TOTALCOST'].to_numpy(dtype=float)
+        codes = np.select([tc <= 0, tc <= 100, tc <= 500, tc <= 1000, tc > 1000], [-1, 0, 1, 2, 3], default=-1)
+        self.df['Cost Category'] = pd.Categorical.from_codes(
+            codes, categories=['<100', '100-500', '500-1000', '>1000'], ordered=True)
 
     def _generate_visualizations(self):
-        fig1, ax1 = plt.subplots(figsize=(10, 6))
-        sns.histplot(self.df['TOTALCOST'], bins=30, kde=True, ax=ax1)
-        ax1.set_title('Repair Cost Distribution')
-        ax1.set_xlabel('Total Cost (USD)')
-        self._save_visualization(fig1, 'repair_cost_distribution')
-
-        fig2, ax2 = plt.subplots(figsize=(10, 6))
-        self.df['Failure Component'].value_counts().plot(kind='bar', ax=ax2)
-        ax2.set_title('Component Failure Frequency')
-        ax2.set_ylabel('Count')
-        self._save_visualization(fig2, 'component_failures')
+        fig, ax = plt.subplots(figsize=(10, 6))
+        sns.histplot(self.df['TOTALCOST'], bins=30, kde=True, ax=ax)
+        ax.set_title('Repair Cost Distribution')
+        ax.set_xlabel('Total Cost (USD)')
+        self._save_visualization(fig, 'repair_cost_distribution')
+
+        ax.clear()
+        self.df['Failure Component'].value_counts().plot(kind='bar', ax=ax)
+        ax.set_title('Component Failure Frequency')
+        ax.set_ylabel('Count')
+        self._save_visualization(fig, 'component_failures')
+        plt.close(fig)
+
+def _run(file_path: str, analyzer_cls, output_path: str) -> List[str]:
+    # Module-level so it can be pickled into a worker process
+    analyzer = analyzer_cls(file_path)
+    analyzer.analyze()
+    analyzer.save_excel(output_path)
+    return analyzer.get_visualizations()
 
 if __name__ == "__main__":
     try:
-        task1 = Task1Analyzer('task1.xlsx')
-        task1.analyze()
-        task1.df.to_excel('Tulika task1_analyzed.xlsx', index=False)
-        logger.info(f"Tulika's Task 1 visualizations: {task1.get_visualizations()}")
-
-        task2 = Task2Analyzer('task2.xlsx')
-        task2.analyze()
-        task2.df.to_excel('Tulika task2_analyzed.xlsx', index=False)
-        logger.info(f"Tulika's Task 2 visualizations: {task2.get_visualizations()}")
+        # The two tasks share no state, so each runs in its own process
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            task1 = executor.submit(_run, 'task1.xlsx', Task1Analyzer, 'Tulika task1_analyzed.xlsx')
+            task2 = executor.submit(_run, 'task2.xlsx', Task2Analyzer, 'Tulika task2_analyzed.xlsx')
+            logger.info(f"Tulika's Task 1 visualizations: {task1.result()}")
+            logger.info(f"Tulika's Task 2 visualizations: {task2.result()}")
 
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}")